@@ -11,6 +11,7 @@ from tournament.utils import timestamp_to_datetime
 
 LICHESS_CHALLENGE = "https://lichess.org/api/challenge/open"
 LICHESS_GAME_EXPORT = "https://lichess.org/game/export/"
+LICHESS_CHALLENGE_CANCEL = "https://lichess.org/api/challenge/{challenge_id}/cancel"
 
 
 def create_lichess_challenge(
@@ -47,6 +48,16 @@ def create_lichess_challenge(
         raise ValueError("Error: " + response.text)
 
 
+def cancel_lichess_challenge(challenge_id: str, api_token=None):
+    """cancel a challenge created by `api_token` owner"""
+    headers = {"Authorization": f"Bearer {api_token}"}
+
+    response = requests.post(LICHESS_CHALLENGE_CANCEL.format(challenge_id=challenge_id), headers=headers)
+
+    if response.status_code != 200:
+        raise ValueError("Error: " + response.text)
+
+
 def get_pgn(game_id, api_token=None) -> str:
     url = f"{LICHESS_GAME_EXPORT}{game_id}?"
     headers = {"Authorization": f"Bearer {api_token}"} if api_token else {}
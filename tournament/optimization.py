@@ -5,6 +5,24 @@ import cvxpy as cp
 from tournament.player import Player
 
 
+def pairing_cost(player_a: Player, player_b: Player, rematch_cost: float, within_fed_cost: float,
+                 experience_cost: float, elo_cost: float, **kwargs) -> float:
+    """apply cost function to a single player pairing"""
+    # difference in experience
+    experience_delta = experience_cost * np.abs(player_a.animal.value - player_b.animal.value)
+    # difference in player scores
+    score_delta = np.abs(player_a.score - player_b.score)
+    # penalize rematches
+    rematch_penalty = rematch_cost * player_a.match_count(player_b.name)
+    # penalize intra-federation match
+    federation_penalty = within_fed_cost * float(player_a.federation == player_b.federation)
+    # fractional elo difference to break ties
+    elo_difference = elo_cost * np.abs(player_a.elo - player_b.elo)
+
+    # sum up costs
+    return experience_delta + score_delta + rematch_penalty + federation_penalty + elo_difference
+
+
 def calculate_cost_matrix(players: list[Player], rematch_cost: float, within_fed_cost: float,
                           experience_cost: float, elo_cost: float, **kwargs) -> np.ndarray:
     """"apply cost function to each pairwise player pairing returning a symmetric cost matrix"""
@@ -14,32 +32,26 @@ def calculate_cost_matrix(players: list[Player], rematch_cost: float, within_fed
     cost_matrix = np.zeros((n, n))
     for i in range(n):
         for j in range(i + 1, n):
-            # difference in experience
-            experience_delta = experience_cost * np.abs(players[i].animal.value - players[j].animal.value)
-            # difference in player scores
-            score_delta = np.abs(players[i].score - players[j].score)
-            # penalize rematches
-            rematch_penalty = rematch_cost * players[i].match_count(players[j].name)
-            # penalize intra-federation match
-            federation_penalty = within_fed_cost * float(
-                players[i].federation == players[j].federation)
-            # fractional elo difference to break ties
-            elo_difference = elo_cost * np.abs(players[i].elo - players[j].elo)
-
-            # sum up costs
-            cost = experience_delta + score_delta + rematch_penalty + federation_penalty + elo_difference
+            cost = pairing_cost(
+                players[i], players[j],
+                rematch_cost=rematch_cost,
+                within_fed_cost=within_fed_cost,
+                experience_cost=experience_cost,
+                elo_cost=elo_cost)
             cost_matrix[i, j] = cost
             cost_matrix[j, i] = cost  # symmetry
 
     return cost_matrix
 
 
-def round_pairings(players: list[Player], solver=cp.GLPK_MI, **kwargs) -> np.ndarray:
+def round_pairings(players: list[Player], solver=cp.GLPK_MI, cost_matrix: np.ndarray | None = None,
+                   **kwargs) -> np.ndarray:
     """use mixed integer linear programming to solve for optimal round pairings"""
 
     n = len(players)
 
-    cost_matrix = calculate_cost_matrix(players, **kwargs)
+    if cost_matrix is None:
+        cost_matrix = calculate_cost_matrix(players, **kwargs)
 
     # pairing matrix
     x = cp.Variable((n, n), boolean=True)
@@ -85,3 +97,77 @@ def player_pairs_from_matrix(pairing_matrix: np.ndarray, players: list[Player])
             matched_players.update([i, j])
 
     return player_pairs
+
+
+def repair_pairings(player_pairs: list[list[Player]], removed: list[str], max_boards: int,
+                    stability_cost: float = 0.01, solver=cp.GLPK_MI,
+                    **kwargs) -> tuple[list[list[Player]], list[list[Player]]]:
+    """
+    re-pair the boards of `removed` players plus up to `max_boards` boards in total around them, keeping the rest
+    fixed. reopened boards are discounted by `stability_cost` and stay fixed when their pairing comes back
+    unchanged. returns (fixed pairs, repaired pairs).
+    """
+    removed = set(removed)
+
+    affected = [pair for pair in player_pairs if any(player.name in removed for player in pair)]
+    fixed = [pair for pair in player_pairs if not any(player.name in removed for player in pair)]
+
+    paired = {player.name for pair in player_pairs for player in pair}
+    if missing := removed - paired:
+        raise ValueError(f"{', '.join(sorted(missing))} not found in open boards!")
+
+    if len(affected) > max_boards:
+        raise ValueError(f"{len(affected)} boards affected but max_boards={max_boards}, re-solve the round instead")
+
+    # partners left without an opponent, bye placeholders are re-added below based on parity
+    freed = [player for pair in affected for player in pair if player.name not in removed and not player.is_bye]
+
+    if not freed:
+        return fixed, []
+
+    reopened = []
+
+    def reopen(pair: list[Player]):
+        fixed.remove(pair)
+        reopened.append(pair)
+        freed.extend(player for player in pair if not player.is_bye)
+
+    bye_boards = [pair for pair in fixed if any(player.is_bye for player in pair)]
+    if len(freed) % 2 != 0 and bye_boards:
+        # hand the existing bye to the repaired boards rather than adding a second one
+        if len(affected) + 1 > max_boards:
+            raise ValueError(f"bye board cannot be reopened with max_boards={max_boards}, re-solve the round instead")
+        reopen(bye_boards[0])
+
+    # reopen the fixed boards with the cheapest pairing cost to any freed player
+    def neighbour_cost(pair: list[Player]) -> float:
+        return min(pairing_cost(player, candidate, **kwargs) for player in freed for candidate in pair)
+
+    neighbours = sorted((pair for pair in fixed if not any(player.is_bye for player in pair)), key=neighbour_cost)
+    for pair in neighbours[:max(max_boards - len(affected) - len(reopened), 0)]:
+        reopen(pair)
+
+    if len(freed) % 2 != 0:
+        freed.append(Player.bye_player())
+
+    def board(pair: list[Player]) -> frozenset[str]:
+        return frozenset(player.name for player in pair)
+
+    # discount existing boards so equal cost alternatives do not reshuffle them
+    cost_matrix = calculate_cost_matrix(freed, **kwargs)
+    existing = {board(pair) for pair in reopened}
+    for i in range(len(freed)):
+        for j in range(i + 1, len(freed)):
+            if board([freed[i], freed[j]]) in existing:
+                cost_matrix[i, j] -= stability_cost
+                cost_matrix[j, i] -= stability_cost
+
+    pairing_matrix = round_pairings(players=freed, solver=solver, cost_matrix=cost_matrix)
+    repaired = player_pairs_from_matrix(pairing_matrix, freed)
+
+    # keep reopened boards whose pairing did not change
+    unchanged = {board(pair) for pair in repaired} & {board(pair) for pair in reopened}
+    fixed.extend(pair for pair in reopened if board(pair) in unchanged)
+    repaired = [pair for pair in repaired if board(pair) not in unchanged]
+
+    return fixed, repaired
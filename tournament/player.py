@@ -58,7 +58,8 @@ class Player:
             PlayerSheetHeader.FEDERATION.value: self.federation,
             PlayerSheetHeader.EXPERIENCE.value: self.animal.name.capitalize(),
             PlayerSheetHeader.ELO.value: self.elo,
-            PlayerSheetHeader.SCORE.value: self.score}
+            PlayerSheetHeader.SCORE.value: self.score,
+            PlayerSheetHeader.WITHDRAWN.value: 'TRUE' if self.withdrawn else 'FALSE'}
 
     def match_count(self, opponent: str) -> int:
         return sum(opponent in {game.white, game.black} for game in self.games)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from attrs import define, field
+
+from tournament.game import Game
+from tournament.utils import Outcome, PlayerSheetHeader
+
+UNPLAYED = -1  # opponent index for byes, expired games and unpadded slots
+INITIAL_CAPACITY = 8
+# ranking order, np.lexsort keys are built from this list
+RANKING_ORDER = [
+    PlayerSheetHeader.SCORE,
+    PlayerSheetHeader.BUCHHOLZ,
+    PlayerSheetHeader.MEDIAN_BUCHHOLZ,
+    PlayerSheetHeader.SONNEBORN_BERGER,
+]
+
+
+@define
+class Standings:
+    """
+    Materialized tournament standings.
+    Results are appended per player into an opponent index matrix as games are added, and the tie-breaks are
+    recomputed lazily with NumPy reductions the first time the standings are queried after a change.
+    """
+    names: list[str] = field(factory=list)
+    _index: dict[str, int] = field(factory=dict, init=False)
+    _opponents: np.ndarray = field(factory=lambda: np.empty((0, 0), dtype=int), init=False)
+    _results: np.ndarray = field(factory=lambda: np.empty((0, 0)), init=False)
+    _rounds: np.ndarray = field(factory=lambda: np.empty(0, dtype=int), init=False)
+    _table: pd.DataFrame | None = field(default=None, init=False)
+
+    def __attrs_post_init__(self):
+        self.reset(self.names)
+
+    def reset(self, names: list[str]):
+        """clear all results and register `names`"""
+        self.names = list(names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self._opponents = np.full((n, INITIAL_CAPACITY), UNPLAYED, dtype=int)
+        self._results = np.zeros((n, INITIAL_CAPACITY))
+        self._rounds = np.zeros(n, dtype=int)
+        self._table = None
+
+    def _grow(self):
+        """double the round capacity of the opponent and result matrices"""
+        n, capacity = self._opponents.shape
+        self._opponents = np.hstack([self._opponents, np.full((n, capacity), UNPLAYED, dtype=int)])
+        self._results = np.hstack([self._results, np.zeros((n, capacity))])
+
+    def _record(self, name: str, opponent: str, points: float, played: bool):
+        i = self._index.get(name)
+        if i is None:
+            # bye player is not ranked
+            return
+
+        if self._rounds[i] >= self._opponents.shape[1]:
+            self._grow()
+
+        j = self._index.get(opponent, UNPLAYED) if played else UNPLAYED
+        self._opponents[i, self._rounds[i]] = j
+        self._results[i, self._rounds[i]] = points
+        self._rounds[i] += 1
+
+    def add_game(self, game: Game):
+        """append `game` result for both players"""
+        played = game.outcome != Outcome.EXPIRED and not game.bye
+        self._record(game.white, game.black, game.get_points(game.white), played)
+        self._record(game.black, game.white, game.get_points(game.black), played)
+        self._table = None
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._results.sum(axis=1)
+
+    def tiebreaks(self) -> dict[str, np.ndarray]:
+        """compute Buchholz, Median-Buchholz and Sonneborn-Berger for all players"""
+        scores = self.scores
+        played = self._opponents != UNPLAYED
+
+        # score of each opponent, zero for byes, expired games and padding
+        opponent_scores = np.where(played, scores[np.where(played, self._opponents, 0)], 0.)
+
+        buchholz = opponent_scores.sum(axis=1)
+
+        # drop the highest and lowest round when there are at least three rounds, unplayed rounds count as zero
+        rounds = np.arange(opponent_scores.shape[1]) < self._rounds[:, None]
+        trimmed = self._rounds > 2
+        highest = np.where(rounds, opponent_scores, -np.inf).max(axis=1, initial=-np.inf)
+        lowest = np.where(rounds, opponent_scores, np.inf).min(axis=1, initial=np.inf)
+        median_buchholz = buchholz - np.where(trimmed, highest, 0.) - np.where(trimmed, lowest, 0.)
+
+        sonneborn_berger = (self._results * opponent_scores).sum(axis=1)
+
+        return {
+            PlayerSheetHeader.BUCHHOLZ.value: buchholz,
+            PlayerSheetHeader.MEDIAN_BUCHHOLZ.value: median_buchholz,
+            PlayerSheetHeader.SONNEBORN_BERGER.value: sonneborn_berger,
+        }
+
+    def table(self) -> pd.DataFrame:
+        """return score and tie-breaks indexed by player name, recomputed only after new games are added"""
+        if self._table is None:
+            self._table = pd.DataFrame(
+                {PlayerSheetHeader.SCORE.value: self.scores, **self.tiebreaks()},
+                index=pd.Index(self.names, name=PlayerSheetHeader.PLAYER.value))
+        return self._table
+
+    def ranking(self, elo: dict[str, float] | None = None) -> list[str]:
+        """return player names sorted by score, tie-breaks and finally `elo`"""
+        table = self.table()
+        elo = elo or {}
+        final_tiebreak = np.array([elo.get(name, 0.) for name in self.names])
+
+        # np.lexsort sorts by the last key first
+        keys = [final_tiebreak] + [table[header.value].to_numpy() for header in reversed(RANKING_ORDER)]
+        order = np.lexsort([-key for key in keys])
+
+        return [self.names[i] for i in order]
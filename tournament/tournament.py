@@ -6,10 +6,11 @@ from gspread_pandas import Spread
 from attrs import define, field
 
 from tournament.game import Game
-from tournament.lichess import create_lichess_challenge, get_game_from_id
-from tournament.optimization import round_pairings, player_pairs_from_matrix
+from tournament.lichess import create_lichess_challenge, get_game_from_id, cancel_lichess_challenge
+from tournament.optimization import round_pairings, player_pairs_from_matrix, repair_pairings
 from tournament.player import Player
-from tournament.utils import expires_at_timestamp, timestamp_to_datetime, Outcome, white_odds, BYE_PLAYER, GamesSheetHeader
+from tournament.standings import Standings
+from tournament.utils import expires_at_timestamp, timestamp_to_datetime, Outcome, white_odds, BYE_PLAYER, GamesSheetHeader, PlayerSheetHeader
 
 SECONDS_PER_MIN = 60
 pd.set_option('future.no_silent_downcasting', True)
@@ -31,15 +32,18 @@ class Tournament:
     within_fed_cost: float = 0.75  # cost to be paired within federation
     experience_cost: float = 1.0  # early round sorting based on difference in experience
     elo_cost: float = 0.0001  # tie-breaker based on abs elo difference
+    stability_cost: float = 0.01  # discount to keep an existing board when repairing a round
     initial_elo: int = field(default=1500)
     clock_secs: int = field(default=SECONDS_PER_MIN * 10)
     increment_secs: int = field(default=5)
     players: list[Player] = field(factory=list, init=False)
     games: list[Game] = field(factory=list, init=False)
+    standings: Standings = field(factory=Standings, init=False)
 
     def __attrs_post_init__(self):
         """load tournament details"""
         self._instantiate_player_list()
+        self.standings.reset([player.name for player in self.players])
         print(f"{len(self.players)} players created")
         self._instantiate_game_list()
         self._process_games()
@@ -101,9 +105,10 @@ class Tournament:
         self.games = []
         for player in self.players:
             player.reset(self.initial_elo)
+        self.standings.reset([player.name for player in self.players])
 
     def update_players(self, game: Game, **kwargs):
-        """add game to players and update elo"""
+        """add game to players and standings and update elo"""
         white_player = self.get_player(game.white)
         black_player = self.get_player(game.black)
 
@@ -113,13 +118,27 @@ class Tournament:
         white_player.update(game, black_elo, **kwargs)
         black_player.update(game, white_elo, **kwargs)
 
+        self.standings.add_game(game)
+
     def update_leaderboard_sheet(self):
         """update and sort leaderboard spreadsheet"""
         print("updating leaderboard sheet")
-        # sort players by score and then elo
-        self.players = sorted(self.players, key=lambda x: [x.score, x.elo], reverse=True)
+        # sort players by score, tie-breaks and then elo
+        ranking = self.standings.ranking(elo={player.name: player.elo for player in self.players})
+        rank = {name: i for i, name in enumerate(ranking)}
+        self.players = sorted(self.players, key=lambda x: rank[x.name])
 
+        # score and tie-breaks come from the materialized standings
         df = pd.DataFrame([player.to_dict() for player in self.players])
+        df = df.drop(columns=PlayerSheetHeader.SCORE.value).join(
+            self.standings.table(),
+            on=PlayerSheetHeader.PLAYER.value)
+        df = df[[header.value for header in PlayerSheetHeader]]
+
+        # carry over any other columns the organiser keeps in the sheet
+        sheet_df = self.spread.sheet_to_df(sheet=self.leaderboard_sheet)
+        other_columns = [column for column in sheet_df.columns if column not in df.columns]
+        df = df.join(sheet_df[other_columns], on=PlayerSheetHeader.PLAYER.value)
 
         self.spread.df_to_sheet(
             df=df,
@@ -142,10 +161,12 @@ class Tournament:
 
         df = df.sort_values('rank')
 
+        # replace sheet since repaired rounds can remove games
         self.spread.df_to_sheet(
             df.drop(columns='rank'),
             index=False,
-            sheet=self.games_sheet)
+            sheet=self.games_sheet,
+            replace=True)
 
     def create_game(self, round_num: int, players: list[Player], lichess_api_token: str,
                     random_sides: bool = True, days_until_expired: int = 7, testing: bool = False,
@@ -267,6 +288,83 @@ class Tournament:
         # update game sheet
         self.update_games_sheet()
 
+    def repair_round(self, lichess_api_token: str, withdrawn: str | list[str] | None = None,
+                     bye_players: str | list[str] | None = None, max_boards: int = 4, testing: bool = False,
+                     **kwargs) -> list[Game]:
+        """
+        re-pair the current round after late withdrawals or bye requests without re-solving the whole round.
+        only boards whose pairing changed among the affected boards and their closest neighbours (at most
+        `max_boards` in-progress boards) are discarded, their lichess challenges cancelled and recreated.
+        returns the discarded games.
+        """
+        round_num = self.current_round
+
+        if isinstance(withdrawn, str):
+            withdrawn = [withdrawn]
+        if isinstance(bye_players, str):
+            bye_players = [bye_players]
+        withdrawn = withdrawn or []
+        bye_players = bye_players or []
+
+        # only boards still in progress may be re-paired
+        open_games = [game for game in self.games if game.round_num == round_num and game.in_progress]
+        player_pairs = [[self.get_player(game.white), self.get_player(game.black)] for game in open_games]
+
+        # withdrawn players who already finished this round have no board to repair
+        open_players = {player.name for pair in player_pairs for player in pair}
+        removed = [name for name in withdrawn if name in open_players] + bye_players
+
+        fixed_pairs, repaired_pairs = repair_pairings(
+            player_pairs=player_pairs,
+            removed=removed,
+            max_boards=max_boards,
+            stability_cost=self.stability_cost,
+            rematch_cost=self.rematch_cost,
+            within_fed_cost=self.within_fed_cost,
+            experience_cost=self.experience_cost / max(round_num - 1, 1),
+            elo_cost=self.elo_cost,
+            **kwargs)
+
+        # discard games whose board changed
+        fixed_players = {player.name for pair in fixed_pairs for player in pair if not player.is_bye}
+        discarded = [game for game in open_games if game.white not in fixed_players]
+        self.games = [game for game in self.games if game not in discarded]
+
+        for name in withdrawn:
+            self.get_player(name).withdrawn = True
+
+        for game in discarded:
+            if testing or game.bye or game.match_link == '':
+                continue
+            try:
+                cancel_lichess_challenge(game.match_link.split('/')[-1], api_token=lichess_api_token)
+            except ValueError as error:
+                print(f"could not cancel {game.match_link}, cancel it manually ({error})")
+
+        for player in bye_players:
+            repaired_pairs.append([self.get_player(player), Player.bye_player()])
+
+        for players in repaired_pairs:
+            self.create_game(
+                round_num=round_num,
+                players=players,
+                lichess_api_token=lichess_api_token,
+                clock_secs=self.clock_secs,
+                increment_secs=self.increment_secs,
+                testing=testing,
+                **kwargs)
+
+        print(f"{len(discarded)} games discarded, {len(repaired_pairs)} games created")
+
+        # update game sheet
+        self.update_games_sheet()
+
+        # persist withdrawn flags
+        if withdrawn:
+            self.update_leaderboard_sheet()
+
+        return discarded
+
     def white_odds(self, game: Game) -> float:
         """odds of white winning"""
         return white_odds(self.get_player(game.white).elo, self.get_player(game.black).elo)
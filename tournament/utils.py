@@ -38,6 +38,9 @@ class PlayerSheetHeader(Enum):
     ELO = 'Elo'
     SCORE = 'Score'
     WITHDRAWN = 'Withdrawn'
+    BUCHHOLZ = 'Buchholz'
+    MEDIAN_BUCHHOLZ = 'Median Buchholz'
+    SONNEBORN_BERGER = 'Sonneborn-Berger'
 
 
 class GamesSheetHeader(Enum):